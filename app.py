@@ -1,12 +1,41 @@
 #!/usr/bin/env python3
-import json, os, re, time, subprocess, requests, threading
+import json, os, re, time, subprocess, requests, threading, logging, mmap, functools, asyncio, string
+from bisect import bisect_right
 from urllib.parse import urlencode, quote_plus, unquote
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
+import httpx
+import resolver
+import m3u8_vavoo
+
+# Importa direttamente la funzione da chiave.py se disponibile
+try:
+    from chiave import get_auth_signature
+except ImportError:
+    get_auth_signature = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Logging: un solo setup all'avvio, i messaggi per canale restano a livello DEBUG
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s", force=True)
+logger = logging.getLogger("mediaflow")
 
 # Percorsi e costanti
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -23,84 +52,162 @@ DATA_DIR = os.path.join(BASE_DIR, 'data')
 os.makedirs(DATA_DIR, exist_ok=True)
 HEADERS_FILE = os.path.join(DATA_DIR, 'headers.json')
 ICONS_FILE = os.path.join(DATA_DIR, 'channel_icons.json')
-CHANNELS_FILE = os.path.join(DATA_DIR, 'channels_data.json')
+# Snapshot binario (MessagePack) della lista canali, JSON se msgpack non è installato
+CHANNELS_FILE = os.path.join(DATA_DIR, 'channels_data.mp' if msgpack else 'channels_data.json')
 CATEGORY_KEYWORDS_FILE = os.path.join(BASE_DIR, 'category_keywords.json')
 
 # Inizializza cartelle necessarie
 os.makedirs(os.path.join(BASE_DIR, "templates"), exist_ok=True)
 os.makedirs(os.path.join(BASE_DIR, "static"), exist_ok=True)
 
-# Inizializzazione FastAPI
-app = FastAPI()
+# Inizializzazione FastAPI (orjson per serializzare i cataloghi, se disponibile)
+app = FastAPI(default_response_class=ORJSONResponse if orjson else JSONResponse)
 app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_credentials=True, allow_methods=["*"], allow_headers=["*"])
 app.mount("/static", StaticFiles(directory=os.path.join(BASE_DIR, "static")), name="static")
 templates = Jinja2Templates(directory=os.path.join(BASE_DIR, "templates"))
 
+# Client HTTP condiviso (keep-alive + HTTP/2) per le chiamate verso Vavoo
+http_client = httpx.AsyncClient(http2=True, limits=httpx.Limits(max_keepalive_connections=20), timeout=15.0)
+
 # Variabili cache
 channels_data_cache = []
 channels_data_timestamp = 0
+channels_soa = None
+category_matcher = None
+# Firma Vavoo riutilizzata tra le richieste stream finché non scade
+SIGNATURE_TTL = 600
+signature_cache = {"signature": None, "timestamp": 0}
+signature_lock = threading.Lock()
+# Una sola generazione alla volta: refresh periodico e richieste senza channels.m3u8 possono sovrapporsi
+generation_lock = threading.Lock()
 
 def load_json_file(filename, default=None):
     try:
         if os.path.exists(filename):
+            if orjson:
+                with open(filename, 'rb') as file:
+                    return orjson.loads(file.read())
             with open(filename, 'r', encoding='utf-8') as file:
                 return json.load(file)
     except Exception as e:
-        print(f"Errore nel caricamento di {filename}: {e}")
+        logger.error(f"Errore nel caricamento di {filename}: {e}")
     return default if default is not None else {}
 
 def save_json_file(filename, data):
     try:
         os.makedirs(os.path.dirname(filename), exist_ok=True)
+        if orjson:
+            with open(filename, 'wb') as file:
+                file.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+            return True
         with open(filename, 'w', encoding='utf-8') as file:
             json.dump(data, file, indent=2, ensure_ascii=False)
         return True
     except Exception as e:
-        print(f"Errore nel salvataggio di {filename}: {e}")
+        logger.error(f"Errore nel salvataggio di {filename}: {e}")
+        return False
+
+def load_channels_file(default=None):
+    if not msgpack:
+        return load_json_file(CHANNELS_FILE, default)
+    try:
+        if os.path.exists(CHANNELS_FILE):
+            with open(CHANNELS_FILE, 'rb') as file:
+                return msgpack.unpackb(file.read(), raw=False)
+    except Exception as e:
+        logger.error(f"Errore nel caricamento di {CHANNELS_FILE}: {e}")
+    return default if default is not None else []
+
+def save_channels_file(channels):
+    if not msgpack:
+        return save_json_file(CHANNELS_FILE, channels)
+    try:
+        os.makedirs(os.path.dirname(CHANNELS_FILE), exist_ok=True)
+        with open(CHANNELS_FILE, 'wb') as file:
+            file.write(msgpack.packb(channels))
+        return True
+    except Exception as e:
+        logger.error(f"Errore nel salvataggio di {CHANNELS_FILE}: {e}")
         return False
 
+_ASCII_LETTERS = frozenset(string.ascii_letters)
+
 def clean_channel_name(name):
-    if len(name) > 3 and re.match(r'\s\.[A-Za-z]', name[-3:]):
+    # Suffisso " .X": tre confronti di caratteri invece di una chiamata al motore regex
+    if len(name) > 3 and name[-3].isspace() and name[-2] == '.' and name[-1] in _ASCII_LETTERS:
         return name[:-3]
     return name
 
+_MFP_RE = re.compile(r'/mfp/([^/]+)/psw/([^/]+)/')
+
 def extract_url_params(request: Request):
-    path = request.url.path
-    mf_url, mf_psw = DEFAULT_MF_URL, DEFAULT_MF_PSW
-    try:
-        if "/mfp/" in path and "/psw/" in path:
-            parts = path.split("/")
-            mfp_index, psw_index = parts.index("mfp"), parts.index("psw")
-            if mfp_index < len(parts) - 1 and psw_index < len(parts) - 1:
-                mf_url, mf_psw = unquote(parts[mfp_index + 1]), unquote(parts[psw_index + 1])
-    except Exception as e:
-        print(f"Errore nell'estrazione parametri URL: {e}")
-    return mf_url, mf_psw
+    match = _MFP_RE.search(request.url.path)
+    if match:
+        return unquote(match.group(1)), unquote(match.group(2))
+    return DEFAULT_MF_URL, DEFAULT_MF_PSW
 
+@functools.lru_cache(maxsize=1)
 def get_category_keywords():
     return load_json_file(CATEGORY_KEYWORDS_FILE, {})
 
+def reload_category_keywords():
+    # Rilegge category_keywords.json al prossimo utilizzo e ricostruisce il matcher delle categorie
+    global category_matcher
+    get_category_keywords.cache_clear()
+    category_matcher = None
+
+def build_category_matcher(category_keywords):
+    # Ogni keyword minuscola punta a (priorità, categoria): a parità di corrispondenze vince
+    # la categoria che compare per prima nel file, come nella scansione sequenziale
+    ranked, always = {}, []
+    for rank, (category, keywords) in enumerate(category_keywords.items()):
+        for keyword in keywords:
+            keyword = keyword.lower()
+            if not keyword:
+                # La stringa vuota è contenuta in ogni nome: la sua categoria è sempre candidata
+                always.append((rank, category))
+            elif keyword not in ranked:
+                ranked[keyword] = (rank, category)
+    
+    automaton = None
+    if ahocorasick and ranked:
+        automaton = ahocorasick.Automaton()
+        for keyword, value in ranked.items():
+            automaton.add_word(keyword, value)
+        automaton.make_automaton()
+    return automaton, ranked, always
+
 def get_channel_category(channel_name):
-    category_keywords = get_category_keywords()
-    if not category_keywords:
-        return "ALTRI"
+    global category_matcher
+    if category_matcher is None:
+        category_matcher = build_category_matcher(get_category_keywords())
+    automaton, ranked, always = category_matcher
+    
     channel_name_lower = channel_name.lower()
-    for category, keywords in category_keywords.items():
-        for keyword in keywords:
-            if keyword.lower() in channel_name_lower:
-                return category
-    return "ALTRI"
+    if automaton:
+        matches = [value for _, value in automaton.iter(channel_name_lower)]
+    else:
+        matches = [value for keyword, value in ranked.items() if keyword in channel_name_lower]
+    matches.extend(always)
+    return min(matches)[1] if matches else "ALTRI"
 
 def get_vavoo_signature():
+    with signature_lock:
+        if signature_cache["signature"] and time.time() - signature_cache["timestamp"] < SIGNATURE_TTL:
+            return signature_cache["signature"]
+        signature = fetch_vavoo_signature()
+        if signature:
+            signature_cache["signature"], signature_cache["timestamp"] = signature, time.time()
+        return signature
+
+def fetch_vavoo_signature():
     try:
-        if os.path.exists(CHIAVE_SCRIPT):
-            result = subprocess.run(['python3', CHIAVE_SCRIPT], capture_output=True, text=True, check=True)
-            if result.stdout.strip():
-                return result.stdout.strip()
+        if get_auth_signature:
+            return get_auth_signature(m3u8_vavoo.SESSION)
         result = subprocess.run(['python3', M3U8_GENERATOR, '--get-signature'], capture_output=True, text=True, check=True)
         return result.stdout.strip() if result.stdout.strip() else None
     except Exception as e:
-        print(f"Errore signature: {e}")
+        logger.error(f"Errore signature: {e}")
         return None
 
 def create_manifest(mf_url, mf_psw):
@@ -116,167 +223,228 @@ def create_manifest(mf_url, mf_psw):
         "background": "https://dl.strem.io/addon-background.jpg",
     }
 
-def generate_m3u8_list():
-    try:
-        if not os.path.exists(M3U8_GENERATOR):
-            print(f"ERRORE: Script {M3U8_GENERATOR} non trovato!")
-            return False
-        result = subprocess.run(['python3', M3U8_GENERATOR], capture_output=True, text=True)
-        if result.returncode == 0 and os.path.exists(M3U8_FILE):
-            print(f"Lista M3U8 generata. Dimensione: {os.path.getsize(M3U8_FILE)} bytes")
-            return True
-        else:
-            print(f"ERRORE generazione M3U8: {result.stderr}")
-            return False
-    except Exception as e:
-        print(f"ERRORE esecuzione generatore: {e}")
-        return False
+def generate_channels():
+    # Genera la lista in-process: m3u8_vavoo scrive channels.m3u8 e restituisce i canali,
+    # che non serve quindi rileggere e analizzare dal file
+    with generation_lock:
+        try:
+            signature = get_vavoo_signature()
+            if not signature:
+                logger.error("ERRORE generazione M3U8: signature non disponibile")
+                return []
+            items = m3u8_vavoo.iter_channels(signature)
+            entries = m3u8_vavoo.generate_m3u(items, signature, *m3u8_vavoo.load_configs(), filename=M3U8_FILE)
+            channels = [channel_from_entry(entry, position) for position, entry in enumerate(entries)]
+            if channels:
+                logger.info(f"Lista M3U8 generata. Canali: {len(channels)}, dimensione: {os.path.getsize(M3U8_FILE)} bytes")
+                save_channels_file(channels)
+            return channels
+        except Exception as e:
+            logger.error(f"ERRORE esecuzione generatore: {e}")
+            return []
+
+# Ogni corrispondenza è un canale completo: attributi #EXTINF, direttive intermedie e URL
+_M3U8_ENTRY_RE = re.compile(rb'^#EXTINF:([^\r\n]*)\r?\n((?:[ \t]*(?:#(?!EXTINF:)[^\r\n]*)?\r?\n)*)[ \t]*([^#\s][^\r\n]*)', re.MULTILINE)
+# Attributi #EXTINF in una sola passata; gli altri attributi tra virgolette vengono saltati
+# così una virgola al loro interno non viene scambiata per l'inizio del nome
+_EXTINF_RE = re.compile(r'tvg-id="(?P<id>[^"]*)"|group-title="(?P<genre>[^"]*)"|tvg-logo="(?P<logo>[^"]*)"|[\w-]+="[^"]*"|,(?P<name>[^\n]+)$')
+
+# Opzioni VLC che diventano header HTTP: chiave VLC -> nome header
+_VLC_HEADER_KEYS = {
+    'http-user-agent': 'user-agent',
+    'http-origin': 'origin',
+    'http-referrer': 'referer',
+}
+
+def parse_vlcopt(value, channel):
+    # Un solo split e una lookup al posto di una serie di ricerche di sottostringa
+    key, separator, option_value = value.partition('=')
+    if not separator:
+        return
+    header = _VLC_HEADER_KEYS.get(key)
+    if header:
+        channel['headers'][header] = option_value
+    elif key == 'mediahubmx-signature':
+        channel['signature_placeholder'] = option_value
+
+# Direttive tra #EXTINF e URL: una lookup sul nome invece di una catena di startswith
+_DIRECTIVE_HANDLERS = {'#EXTVLCOPT': parse_vlcopt}
+
+def iter_m3u8_entries(path):
+    # Il file viene mappato in memoria e scandito dalla regex senza copiarlo in una stringa Python
+    if os.path.getsize(path) == 0:
+        return
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+        for match in _M3U8_ENTRY_RE.finditer(content):
+            yield tuple(group.decode('utf-8') for group in match.groups())
 
 def parse_m3u8_to_channels():
     channels = []
     try:
         if not os.path.exists(M3U8_FILE):
-            if not generate_m3u8_list():
-                return []
-        with open(M3U8_FILE, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-        
-        channel, headers, sig_placeholder = None, {}, None
-        for line in lines:
-            line = line.strip()
-            if line.startswith('#EXTINF:'):
-                channel = {}
-                tvg_id_match = re.search(r'tvg-id="([^"]+)"', line)
-                channel['id'] = tvg_id_match.group(1).replace(' ', '-').lower() if tvg_id_match else f"channel-{len(channels)}"
-                
-                name_match = re.search(r',([^\n]+)$', line)
-                channel['name'] = name_match.group(1).strip() if name_match else f"Channel {len(channels)}"
-                
-                genre_match = re.search(r'group-title="([^"]+)"', line)
-                channel['genre'] = genre_match.group(1) if genre_match else get_channel_category(channel['name'])
-                
-                logo_match = re.search(r'tvg-logo="([^"]+)"', line)
-                channel['logo'] = logo_match.group(1) if logo_match else ""
-                
-                headers, sig_placeholder = {}, None
-            elif line.startswith('#EXTVLCOPT:'):
-                if "http-user-agent=" in line:
-                    headers['user-agent'] = line.split('=', 1)[1]
-                elif "http-origin=" in line:
-                    headers['origin'] = line.split('=', 1)[1]
-                elif "http-referrer=" in line:
-                    headers['referer'] = line.split('=', 1)[1]
-                elif "mediahubmx-signature=" in line:
-                    sig_placeholder = line.split('=', 1)[1]
-            elif line and not line.startswith('#') and channel:
-                channel['url'] = line
-                channel['headers'] = headers
-                channel['signature_placeholder'] = sig_placeholder
-                channels.append(channel)
-                channel = None
+            return generate_channels()
+        for extinf, options, url in iter_m3u8_entries(M3U8_FILE):
+            attrs = {}
+            for attr_match in _EXTINF_RE.finditer(extinf):
+                key = attr_match.lastgroup
+                if key and key not in attrs and attr_match.group(key):
+                    attrs[key] = attr_match.group(key)
+            
+            channel = {}
+            channel['id'] = attrs['id'].replace(' ', '-').lower() if 'id' in attrs else f"channel-{len(channels)}"
+            channel['name'] = attrs['name'].strip() if 'name' in attrs else f"Channel {len(channels)}"
+            channel['name_lower'] = channel['name'].lower()
+            channel['genre'] = attrs.get('genre') or get_channel_category(channel['name'])
+            channel['logo'] = attrs.get('logo', "")
+            
+            channel['headers'], channel['signature_placeholder'] = {}, None
+            for line in options.split('\n'):
+                directive, separator, value = line.strip().partition(':')
+                handler = _DIRECTIVE_HANDLERS.get(directive) if separator else None
+                if handler:
+                    handler(value, channel)
+            
+            channel['url'] = url.strip()
+            channels.append(channel)
         
         if channels:
-            save_json_file(CHANNELS_FILE, channels)
+            save_channels_file(channels)
         return channels
     except Exception as e:
-        print(f"Errore analisi M3U8: {e}")
+        logger.error(f"Errore analisi M3U8: {e}")
         return []
 
+def channel_from_entry(entry, position):
+    # Stessi campi che parse_m3u8_to_channels ricava dalla riga #EXTINF e dalle #EXTVLCOPT
+    tvg_id = entry["tvg_id"]
+    channel = {}
+    channel['id'] = tvg_id.replace(' ', '-').lower() if tvg_id else f"channel-{position}"
+    channel['name'] = tvg_id or f"Channel {position}"
+    channel['name_lower'] = channel['name'].lower()
+    channel['genre'] = entry["category"] or get_channel_category(channel['name'])
+    channel['logo'] = entry["logo"]
+    
+    channel['headers'], channel['signature_placeholder'] = {}, None
+    for option in m3u8_vavoo.VLC_OPTIONS:
+        parse_vlcopt(option, channel)
+    
+    channel['url'] = entry["url"]
+    return channel
+
 def get_channels_data():
     global channels_data_cache, channels_data_timestamp
     current_time = time.time()
     
     if not channels_data_cache or (current_time - channels_data_timestamp) > 3600:
-        channels = load_json_file(CHANNELS_FILE, [])
+        channels = load_channels_file([])
         if not channels:
             channels = parse_m3u8_to_channels()
         
         if channels:
+            # I file salvati da versioni precedenti non hanno il nome minuscolo precalcolato
+            for channel in channels:
+                if 'name_lower' not in channel:
+                    channel['name_lower'] = channel['name'].lower()
             channels_data_cache = channels
             channels_data_timestamp = current_time
     
     return channels_data_cache
 
-def to_meta(channel, mf_url, mf_psw):
-    channel_name = clean_channel_name(channel["name"])
-    logo = channel.get("logo", "https://dl.strem.io/addon-logo.png")
-    genre = channel.get("genre", "ALTRI")
-    
-    return {
-        "id": f"mediaflow-{channel['id']}", "name": channel_name, "type": "tv",
-        "genres": [genre], "poster": logo, "posterShape": "square",
-        "background": logo, "logo": logo
-    }
+class ChannelsSoA:
+    # Colonne parallele (una lista per campo) ricavate da channels_data_cache: i filtri del
+    # catalogo scorrono liste compatte invece di accedere ai dict canale per canale
+    def __init__(self, channels):
+        self.channels = channels
+        self.entries, self.ids, self.names, self.names_lower, self.genres, self.logos = [], [], [], [], [], []
+        for channel in channels:
+            try:
+                meta_id = f"mediaflow-{channel['id']}"
+                name = clean_channel_name(channel["name"])
+                name_lower = channel["name_lower"]
+            except Exception as e:
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Errore canale {channel.get('name', 'Unknown')}: {e}")
+                continue
+            self.entries.append(channel)
+            self.ids.append(meta_id)
+            self.names.append(name)
+            self.names_lower.append(name_lower)
+            self.genres.append(channel.get("genre", "ALTRI"))
+            self.logos.append(channel.get("logo", "https://dl.strem.io/addon-logo.png"))
+        
+        # Nomi minuscoli concatenati e offset di inizio di ciascun nome, per la ricerca
+        self.search_offsets, position = [], 0
+        for name_lower in self.names_lower:
+            self.search_offsets.append(position)
+            position += len(name_lower) + 1
+        self.search_buffer = "\x00".join(self.names_lower)
+        # Indice id -> posizione nelle colonne (a parità di id vince il primo canale)
+        self.positions = {meta_id: i for i, meta_id in reversed(list(enumerate(self.ids)))}
+        # I meta non dipendono da mf_url/mf_psw: si costruiscono una volta per aggiornamento della cache
+        self.metas = [self.meta(i) for i in range(len(self.ids))]
+        # Meta raggruppati per categoria: il filtro del catalogo diventa una lookup
+        self.metas_by_genre = {}
+        for genre, meta in zip(self.genres, self.metas):
+            self.metas_by_genre.setdefault(genre, []).append(meta)
+    
+    def search(self, query):
+        # Una sola scansione in C (str.find) sul buffer invece di un ciclo Python per canale
+        if not query or "\x00" in query:
+            return []
+        
+        offsets, indices = self.search_offsets, []
+        start = self.search_buffer.find(query)
+        while start != -1:
+            index = bisect_right(offsets, start) - 1
+            indices.append(index)
+            if index + 1 >= len(offsets):
+                break
+            start = self.search_buffer.find(query, offsets[index + 1])
+        return indices
+    
+    def meta(self, index):
+        logo = self.logos[index]
+        return {
+            "id": self.ids[index], "name": self.names[index], "type": "tv",
+            "genres": [self.genres[index]], "poster": logo, "posterShape": "square",
+            "background": logo, "logo": logo
+        }
 
-def resolve_stream_url(channel, mf_url, mf_psw):
+def get_channels_soa():
+    global channels_soa
+    channels = get_channels_data()
+    if channels_soa is None or channels_soa.channels is not channels:
+        channels_soa = ChannelsSoA(channels)
+    return channels_soa
+
+@functools.lru_cache(maxsize=32)
+def encode_header_params(header_items):
+    # Gli header dei canali sono quasi sempre gli stessi: la loro codifica h_* si calcola una volta
+    return "".join(f"&h_{quote_plus(key)}={quote_plus(value)}" for key, value in header_items)
+
+def _build_proxy_url(mf_url, mf_psw, stream_url, headers, signature=None):
+    """Costruisce l'URL MediaFlow Proxy, aggiungendo la firma solo se presente"""
+    header_params = encode_header_params(tuple(headers.items()))
+    mf_url_final = f"https://{mf_url}/proxy/hls/manifest.m3u8?api_password={quote_plus(mf_psw)}&d={quote_plus(stream_url)}{header_params}"
+    if signature:
+        mf_url_final += f"&h_mediahubmx-signature={quote_plus(signature)}"
+    return mf_url_final
+
+async def resolve_stream_url(channel, mf_url, mf_psw):
     channel_name = clean_channel_name(channel["name"])
     headers = channel.get("headers", {})
     sig_placeholder = channel.get("signature_placeholder")
     stream_url = channel["url"]
-    resolved_url, stremio_headers = None, {}
+    resolved_url, signature = None, None
     
     if sig_placeholder == "[$KEY$]":
-        signature = get_vavoo_signature()
-        
-        if signature:
-            if "localhost" not in stream_url:
-                try:
-                    RESOLVER_SCRIPT = os.path.join(BASE_DIR, 'resolver.py')
-                    if os.path.exists(RESOLVER_SCRIPT):
-                        result = subprocess.run(
-                            ['python3', RESOLVER_SCRIPT, '--url', stream_url, '--signature', signature, '--json'],
-                            capture_output=True, text=True, timeout=15
-                        )
-                        if result.returncode == 0 and result.stdout.strip():
-                            try:
-                                resolver_result = json.loads(result.stdout)
-                                if resolver_result["success"] and resolver_result["resolved_url"]:
-                                    resolved_url = resolver_result["resolved_url"]
-                            except json.JSONDecodeError:
-                                resolved_url = result.stdout.strip()
-                except Exception as e:
-                    print(f"Errore resolver.py: {e}")
-            
-            if headers:
-                stremio_headers = headers.copy()
-            
-            stremio_headers["mediahubmx-signature"] = signature
-            stremio_headers["user-agent"] = "Mozilla/5.0 (Linux; Android 10; Nexus 5) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/98.0.4758.101 Mobile Safari/537.36"
-            
-            params = {
-                "api_password": mf_psw,
-                "d": resolved_url or stream_url
-            }
-            
-            for key, value in headers.items():
-                params[f"h_{key}"] = value
-            
-            params["h_mediahubmx-signature"] = signature
-            
-            mf_url_final = f"https://{mf_url}/proxy/hls/manifest.m3u8?{urlencode(params, quote_via=quote_plus)}"
-        else:
-            params = {
-                "api_password": mf_psw,
-                "d": stream_url
-            }
-            
-            for key, value in headers.items():
-                params[f"h_{key}"] = value
-            
-            mf_url_final = f"https://{mf_url}/proxy/hls/manifest.m3u8?{urlencode(params, quote_via=quote_plus)}"
-    else:
-        params = {
-            "api_password": mf_psw,
-            "d": stream_url
-        }
-        
-        for key, value in headers.items():
-            params[f"h_{key}"] = value
+        # La richiesta della firma è bloccante (requests): la si esegue fuori dall'event loop
+        signature = await asyncio.to_thread(get_vavoo_signature)
         
-        mf_url_final = f"https://{mf_url}/proxy/hls/manifest.m3u8?{urlencode(params, quote_via=quote_plus)}"
-        stremio_headers = headers.copy()
-        stremio_headers["user-agent"] = "Mozilla/5.0 (Linux; Android 10; Nexus 5) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/98.0.4758.101 Mobile/15E148 Safari/537.36"
-        resolved_url = stream_url
+        if signature and "localhost" not in stream_url:
+            resolved_url = await resolver.resolve_link_async(http_client, stream_url, signature)
+    
+    mf_url_final = _build_proxy_url(mf_url, mf_psw, resolved_url or stream_url, headers, signature)
     
     streams = [
         {
@@ -309,7 +477,7 @@ def resolve_stream_url(channel, mf_url, mf_psw):
     smallprox_params["user-agent"] = "Mozilla/5.0 (Linux; Android 10; Nexus 5) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/98.0.4758.101 Mobile Safari/537.36"
     
     # Aggiungi signature se disponibile
-    if sig_placeholder == "[$KEY$]" and signature:
+    if signature:
         smallprox_params["mediahubmx-signature"] = signature
     
     smallprox_url = f"https://smallprox.onrender.com/proxy/m3u8?{urlencode(smallprox_params, quote_via=quote_plus)}"
@@ -322,36 +490,57 @@ def resolve_stream_url(channel, mf_url, mf_psw):
     
     return streams
 
-def get_all_channels(mf_url, mf_psw):
+def get_all_channels(mf_url, mf_psw, category=None, search=None):
     if not mf_url or not mf_psw:
         return []
     
     try:
-        channels_data = get_channels_data()
-        all_channels = []
-        for channel in channels_data:
-            try:
-                meta = to_meta(channel, mf_url, mf_psw)
-                all_channels.append(meta)
-            except Exception as e:
-                print(f"Errore canale {channel.get('name', 'Unknown')}: {e}")
-        
-        return all_channels
+        soa = get_channels_soa()
+        if not search and category is None:
+            return soa.metas
+        if not search:
+            return soa.metas_by_genre.get(category, [])
+        genres = soa.genres
+        if category is not None:
+            indices = [i for i in soa.search(search) if genres[i] == category]
+        else:
+            indices = soa.search(search)
+        metas = soa.metas
+        return [metas[i] for i in indices]
     except Exception as e:
-        print(f"Errore in get_all_channels: {e}")
+        logger.error(f"Errore in get_all_channels: {e}")
         return []
 
-def refresh_channels_periodically():
+def get_channel_meta(mf_url, mf_psw, meta_id):
+    if not mf_url or not mf_psw:
+        return {}
+    
+    soa = get_channels_soa()
+    index = soa.positions.get(meta_id)
+    return soa.metas[index] if index is not None else {}
+
+def get_original_channel(meta_id):
+    soa = get_channels_soa()
+    index = soa.positions.get(meta_id)
+    return soa.entries[index] if index is not None else None
+
+def publish_channels(channels):
+    """Sostituisce la cache in un colpo solo: chi legge vede sempre una lista completa"""
+    global channels_data_cache, channels_data_timestamp
+    channels_data_cache = channels
+    channels_data_timestamp = time.time()
+
+async def refresh_channels_periodically():
     while True:
+        await asyncio.sleep(20 * 60)
         try:
-            if generate_m3u8_list():
-                parse_m3u8_to_channels()
-                global channels_data_cache, channels_data_timestamp
-                channels_data_cache = []
-                channels_data_timestamp = 0
+            reload_category_keywords()
+            # La generazione fa richieste HTTP bloccanti: la eseguiamo fuori dall'event loop
+            channels = await asyncio.to_thread(generate_channels)
+            if channels:
+                publish_channels(channels)
         except Exception as e:
-            print(f"Errore aggiornamento canali: {e}")
-        time.sleep(20 * 60)
+            logger.error(f"Errore aggiornamento canali: {e}")
 
 def create_index_template():
     template_path = os.path.join(BASE_DIR, "templates", "index.html")
@@ -369,6 +558,15 @@ def create_index_template():
         else:
             raise Exception(f"File template non trovato: {template_json_path}")
 
+@app.on_event("startup")
+async def start_refresh_task():
+    # Teniamo un riferimento al task per evitare che venga raccolto dal GC
+    app.state.refresh_task = asyncio.create_task(refresh_channels_periodically())
+
+@app.on_event("shutdown")
+async def close_http_client():
+    await http_client.aclose()
+
 # Rotte API
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
@@ -382,7 +580,7 @@ async def status():
     m3u8_exists = os.path.exists(M3U8_FILE)
     m3u8_size = os.path.getsize(M3U8_FILE) if m3u8_exists else 0
     channels_file_exists = os.path.exists(CHANNELS_FILE)
-    channels_count = len(load_json_file(CHANNELS_FILE, [])) if channels_file_exists else 0
+    channels_count = len(load_channels_file([])) if channels_file_exists else 0
     cache_channels = len(channels_data_cache)
     m3u8_generator_exists = os.path.exists(M3U8_GENERATOR)
     chiave_script_exists = os.path.exists(CHIAVE_SCRIPT)
@@ -413,17 +611,12 @@ async def catalog_with_search_param(url: str, psw: str, type: str, id: str, sear
         return {"metas": []}
     
     category = id.split("-")[1]
-    all_channels = get_all_channels(url, psw)
     
     search = None
     if search_param and search_param.startswith("search="):
         search = unquote(search_param.split("=")[1])
     
-    if not search:
-        filtered_channels = [c for c in all_channels if c["genres"][0] == category]
-    else:
-        search = search.lower()
-        filtered_channels = [c for c in all_channels if search in c["name"].lower()]
+    filtered_channels = get_all_channels(url, psw, category, search.lower() if search else None)
     
     return {"metas": filtered_channels}
 
@@ -433,13 +626,8 @@ async def catalog_with_params(url: str, psw: str, type: str, id: str, request: R
         return {"metas": []}
     
     category = id.split("-")[1]
-    all_channels = get_all_channels(url, psw)
-    
-    filtered_channels = [c for c in all_channels if c["genres"][0] == category]
     
-    if search:
-        search = search.lower()
-        filtered_channels = [c for c in all_channels if search in c["name"].lower()]
+    filtered_channels = get_all_channels(url, psw, category, search.lower() if search else None)
     
     return {"metas": filtered_channels}
 
@@ -450,13 +638,8 @@ async def catalog(type: str, id: str, request: Request, genre: str = None, searc
     
     mf_url, mf_psw = extract_url_params(request)
     category = id.split("-")[1]
-    all_channels = get_all_channels(mf_url, mf_psw)
     
-    filtered_channels = [c for c in all_channels if c["genres"][0] == category]
-    
-    if search:
-        search = search.lower()
-        filtered_channels = [c for c in all_channels if search in c["name"].lower()]
+    filtered_channels = get_all_channels(mf_url, mf_psw, category, search.lower() if search else None)
     
     return {"metas": filtered_channels}
 
@@ -465,10 +648,7 @@ async def meta_with_params(url: str, psw: str, type: str, id: str):
     if type != "tv" or not id.startswith("mediaflow-"):
         return {"meta": {}}
     
-    all_channels = get_all_channels(url, psw)
-    channel = next((c for c in all_channels if c["id"] == id), None)
-    
-    return {"meta": channel} if channel else {"meta": {}}
+    return {"meta": get_channel_meta(url, psw, id)}
 
 @app.get("/meta/{type}/{id}.json")
 async def meta(type: str, id: str, request: Request):
@@ -476,23 +656,19 @@ async def meta(type: str, id: str, request: Request):
         return {"meta": {}}
     
     mf_url, mf_psw = extract_url_params(request)
-    all_channels = get_all_channels(mf_url, mf_psw)
-    channel = next((c for c in all_channels if c["id"] == id), None)
-    
-    return {"meta": channel} if channel else {"meta": {}}
+    return {"meta": get_channel_meta(mf_url, mf_psw, id)}
 
 @app.get("/mfp/{url}/psw/{psw}/stream/{type}/{id}.json")
 async def stream_with_params(url: str, psw: str, type: str, id: str):
     if type != "tv" or not id.startswith("mediaflow-"):
         return {"streams": []}
     
-    all_channels = get_all_channels(url, psw)
-    original_channel = next((c for c in channels_data_cache if f"mediaflow-{c['id']}" == id), None)
+    original_channel = get_original_channel(id)
     
     if not original_channel:
         return {"streams": []}
     
-    stream_info = resolve_stream_url(original_channel, url, psw)
+    stream_info = await resolve_stream_url(original_channel, url, psw)
     
     return {"streams": stream_info}
 
@@ -502,12 +678,12 @@ async def stream(type: str, id: str, request: Request):
         return {"streams": []}
     
     mf_url, mf_psw = extract_url_params(request)
-    original_channel = next((c for c in channels_data_cache if f"mediaflow-{c['id']}" == id), None)
+    original_channel = get_original_channel(id)
     
     if not original_channel:
         return {"streams": []}
     
-    stream_info = resolve_stream_url(original_channel, mf_url, mf_psw)
+    stream_info = await resolve_stream_url(original_channel, mf_url, mf_psw)
     
     return {"streams": stream_info}
 
@@ -515,10 +691,8 @@ async def stream(type: str, id: str, request: Request):
 if __name__ == "__main__":
     create_index_template()
     
-    if generate_m3u8_list():
-        channels = parse_m3u8_to_channels()
-    
-    update_thread = threading.Thread(target=refresh_channels_periodically, daemon=True)
-    update_thread.start()
+    channels = generate_channels()
+    if channels:
+        publish_channels(channels)
     
     uvicorn.run(app, host="0.0.0.0", port=PORT)
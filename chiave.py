@@ -1,12 +1,14 @@
 #!/usr/bin/env python3
 import requests
+from urllib3.util.request import ACCEPT_ENCODING
 import json
 import sys
 import os
 
-def get_auth_signature():
+def get_auth_signature(session=None):
     """
     Recupera la firma di autenticazione dalle API di Vavoo.
+    Se viene passata una requests.Session la richiesta riusa le sue connessioni.
     Restituisce la signature come stringa o None in caso di errore.
     """
     headers = {
@@ -14,7 +16,7 @@ def get_auth_signature():
         "accept": "application/json",
         "content-type": "application/json; charset=utf-8",
         "content-length": "1106",
-        "accept-encoding": "gzip"
+        "accept-encoding": ACCEPT_ENCODING
     }
 
     data = {
@@ -76,7 +78,7 @@ def get_auth_signature():
     }
 
     try:
-        response = requests.post("https://www.vavoo.tv/api/app/ping", json=data, headers=headers)
+        response = (session or requests).post("https://www.vavoo.tv/api/app/ping", json=data, headers=headers, timeout=(5, 30))
         response.raise_for_status()
         res_json = response.json()
         return res_json.get("addonSig")
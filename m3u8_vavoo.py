@@ -1,18 +1,60 @@
 #!/usr/bin/env python3
 import requests
+import httpx
 import json
 import logging
+import queue
+import atexit
 import sys
 import re
 import os
+import copy
+import functools
+import itertools
+import importlib.util
+import time
+import argparse
 import subprocess
+import threading
+from bisect import bisect_right
+from logging.handlers import QueueHandler, QueueListener
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+CHIAVE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "chiave.py")
+
+def load_chiave():
+    # chiave.py accanto a questo file, caricato nello stesso processo anche se la cartella non è in sys.path
+    spec = importlib.util.spec_from_file_location("chiave", CHIAVE_FILE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.get_auth_signature
 
 # Importa direttamente la funzione da chiave.py se disponibile
 try:
     from chiave import get_auth_signature
 except ImportError:
+    get_auth_signature = None
+    if os.path.exists(CHIAVE_FILE):
+        try:
+            get_auth_signature = load_chiave()
+        except Exception as e:
+            print(f"Errore durante il caricamento di chiave.py: {e}")
+
+if get_auth_signature is None:
     # Fallback: il file chiave.py potrebbe non essere ancora stato creato
-    def get_auth_signature():
+    def get_auth_signature(session=None):
         try:
             # Esegui lo script chiave.py come processo separato
             result = subprocess.run(['python3', 'chiave.py'], 
@@ -22,140 +64,352 @@ except ImportError:
             print(f"Errore durante l'esecuzione di chiave.py: {e}")
             return None
 
+DEFAULTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "defaults.json")
+
+CATALOG_URL = "https://vavoo.to/vto-cluster/mediahubmx-catalog.json"
+
+# Sessione per la richiesta della firma (chiave.py usa requests): keep-alive e retry sugli errori di rete
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=Retry(total=3, backoff_factor=0.3)))
+
+# Client HTTP/2 per il catalogo: le pagine richieste in parallelo condividono una sola connessione.
+# httpx chiede da solo gzip/deflate (e br se brotli è installato)
+CATALOG_CLIENT = httpx.Client(
+    transport=httpx.HTTPTransport(http2=True, retries=3),
+    headers={
+        "User-Agent": "MediaHubMX/2",
+        "Accept": "application/json",
+        "Content-Type": "application/json; charset=utf-8",
+    },
+    timeout=httpx.Timeout(30.0, connect=5.0),
+)
+
+# Suffissi ".c"/".s" dei nomi vavoo, compilati una volta sola
+_SUFFIX_RE = re.compile(r"\.[cs]$", re.IGNORECASE)
+_SPACED_SUFFIX_RE = re.compile(r"\s+\.[cs]$", re.IGNORECASE)
+
+# Firma salvata su disco: valida per diversi minuti, evita il ping a ogni esecuzione
+SIGNATURE_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "vavoo_sig.json")
+SIGNATURE_TTL = 600
+
+# Messaggi di generazione: nel server finiscono nel logging dell'app, da script li stampa main()
+logger = logging.getLogger("m3u8_vavoo")
+
+# Le esclusioni vanno solo su excluded_channels.log, anche quando il modulo è importato da app.py
+excluded_logger = logging.getLogger("m3u8_vavoo.excluded")
+excluded_logger.propagate = False
+_log_listener = None
+
 def setup_logging():
-    logging.basicConfig(filename="excluded_channels.log", level=logging.INFO, format="%(asctime)s - %(message)s")
+    global _log_listener
+    if _log_listener is not None:
+        return
+    # Il ciclo di generazione accoda solo i record; la scrittura su file avviene in un thread separato
+    log_queue = queue.Queue(-1)
+    file_handler = logging.FileHandler("excluded_channels.log")
+    file_handler.setFormatter(logging.Formatter("%(asctime)s - %(message)s"))
+    _log_listener = QueueListener(log_queue, file_handler)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+    excluded_logger.addHandler(QueueHandler(log_queue))
+    excluded_logger.setLevel(logging.INFO)
 
 def sanitize_tvg_id(channel_name):
-    channel_name = re.sub(r"\.[cs]$", "", channel_name, flags=re.IGNORECASE).strip()
+    channel_name = _SUFFIX_RE.sub("", channel_name).strip()
     return " ".join(word.capitalize() for word in channel_name.split())
 
 def load_config(filename):
     if os.path.exists(filename):
+        if orjson:
+            with open(filename, 'rb') as f:
+                return orjson.loads(f.read())
         with open(filename, 'r', encoding='utf-8') as f:
             return json.load(f)
     return {}
 
-def get_category(channel_name, category_keywords):
-    lower_name = channel_name.lower()
+def save_config(filename, data):
+    if orjson:
+        with open(filename, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        return
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=4)
+
+def get_cached_signature(force_refresh=False):
+    """
+    Restituisce la firma salvata se più recente di SIGNATURE_TTL secondi,
+    altrimenti ne richiede una nuova e la salva in modo atomico.
+    """
+    if not force_refresh:
+        try:
+            if time.time() - os.stat(SIGNATURE_CACHE).st_mtime < SIGNATURE_TTL:
+                signature = load_config(SIGNATURE_CACHE).get("signature")
+                if signature:
+                    return signature
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    signature = get_auth_signature(SESSION)
+    if signature:
+        try:
+            os.makedirs(os.path.dirname(SIGNATURE_CACHE), exist_ok=True)
+            tmp_filename = f"{SIGNATURE_CACHE}.tmp"
+            save_config(tmp_filename, {"signature": signature})
+            os.replace(tmp_filename, SIGNATURE_CACHE)
+        except OSError as e:
+            logging.debug(f"Impossibile salvare la firma in cache: {e}")
+    return signature
+
+def compile_keywords(keywords):
+    # Un'unica alternanza: una sola search() in C invece di un any() per parola.
+    # Le parole arrivano già in minuscolo da load_configs e si confrontano col nome in minuscolo
+    if not keywords:
+        return None
+    return re.compile("|".join(map(re.escape, keywords)))
+
+def compile_categories(category_keywords):
+    patterns = []
     for category, keywords in category_keywords.items():
-        if any(keyword.lower() in lower_name for keyword in keywords):
+        pattern = compile_keywords(keywords)
+        if pattern:
+            patterns.append((category, pattern))
+    return patterns
+
+def get_category(name_lower, category_patterns):
+    for category, pattern in category_patterns:
+        if pattern.search(name_lower):
             return category
     return "ALTRI"
 
+REMOVE, FILTER = "remove", "filter"
+
+class KeywordMatcher:
+    """
+    Decide in un colpo solo se un canale va rimosso, se passa i filtri e a che categoria appartiene.
+    Con pyahocorasick tutte le parole chiave stanno in un unico automa e basta una passata sul nome;
+    senza, si ricade sulle alternanze regex. Le parole chiave devono essere già in minuscolo.
+    """
+    def __init__(self, channel_filters, channel_remove, category_keywords):
+        self.has_filters = bool(channel_filters)
+        self.automaton = None
+        if ahocorasick:
+            # Ogni parola punta all'insieme dei suoi tag: REMOVE, FILTER o (priorità, categoria)
+            tags = {}
+            for keyword in channel_remove:
+                tags.setdefault(keyword, set()).add(REMOVE)
+            for keyword in channel_filters:
+                tags.setdefault(keyword, set()).add(FILTER)
+            for rank, (category, keywords) in enumerate(category_keywords.items()):
+                for keyword in keywords:
+                    tags.setdefault(keyword, set()).add((rank, category))
+            # La stringa vuota è contenuta in ogni nome: i suoi tag valgono sempre
+            self.always = frozenset(tags.pop("", ()))
+            if tags:
+                self.automaton = ahocorasick.Automaton()
+                for keyword, keyword_tags in tags.items():
+                    self.automaton.add_word(keyword, frozenset(keyword_tags))
+                self.automaton.make_automaton()
+        else:
+            # Parole intere: un'intersezione di insiemi decide i casi comuni prima della regex
+            self.remove_set = frozenset(channel_remove)
+            self.filter_set = frozenset(channel_filters)
+            self.remove_re = compile_keywords(channel_remove)
+            self.filter_re = compile_keywords(channel_filters)
+            self.category_patterns = compile_categories(category_keywords)
+
+    def match(self, name_lower):
+        """Restituisce (da rimuovere, passa i filtri, categoria) per il nome in minuscolo"""
+        if not ahocorasick:
+            tokens = set(name_lower.split())
+            removed = not tokens.isdisjoint(self.remove_set) or bool(self.remove_re and self.remove_re.search(name_lower))
+            kept = (not self.filter_re or not tokens.isdisjoint(self.filter_set)
+                    or bool(self.filter_re.search(name_lower)))
+            return removed, kept, get_category(name_lower, self.category_patterns)
+        
+        tags = set(self.always)
+        if self.automaton:
+            for _, keyword_tags in self.automaton.iter(name_lower):
+                tags |= keyword_tags
+        # A parità di corrispondenze vince la categoria che compare per prima nel file
+        ranked = [tag for tag in tags if isinstance(tag, tuple)]
+        return REMOVE in tags, not self.has_filters or FILTER in tags, min(ranked)[1] if ranked else "ALTRI"
+
 def normalize_channel_name(channel_name):
     # Rimuovi solo il suffisso " .c" o " .s" (incluso lo spazio)
-    clean_name = re.sub(r"\s+\.[cs]$", "", channel_name, flags=re.IGNORECASE).strip()
+    clean_name = _SPACED_SUFFIX_RE.sub("", channel_name).strip()
     return clean_name.lower()
 
-def get_logo_url(channel_name, channel_logos):
-    # Normalizza il nome del canale rimuovendo solo il suffisso " .c" o " .s"
-    normalized_name = normalize_channel_name(channel_name)
-    
-    print(f"DEBUG - Cercando logo per: '{channel_name}' → normalizzato a: '{normalized_name}'")
+class LogoIndex:
+    """
+    Cerca i loghi senza rinormalizzare tutte le voci di channel_icons.json per ogni canale.
+    Vince la prima voce del file il cui nome normalizzato contiene il nome del canale
+    o è contenuto in esso, esattamente come nella scansione sequenziale.
+    """
+    def __init__(self, channel_logos):
+        self.keys = [normalize_channel_name(logo_channel) for logo_channel in channel_logos]
+        self.urls = list(channel_logos.values())
+        
+        # Voci concatenate: una find() trova la prima voce che contiene il nome del canale
+        self.offsets, position = [], 0
+        for key in self.keys:
+            self.offsets.append(position)
+            position += len(key) + 1
+        self.buffer = "\x00".join(self.keys)
+        
+        # Automa sulle voci: una passata sul nome trova quelle contenute nel nome del canale
+        self.automaton, self.first_empty = None, None
+        if ahocorasick:
+            automaton = ahocorasick.Automaton()
+            for position, key in enumerate(self.keys):
+                if not key:
+                    # Una voce vuota è contenuta in qualsiasi nome
+                    if self.first_empty is None:
+                        self.first_empty = position
+                elif key not in automaton:
+                    automaton.add_word(key, position)
+            if len(automaton):
+                automaton.make_automaton()
+                self.automaton = automaton
     
-    # Cerca nel dizionario usando i nomi normalizzati
-    for logo_channel, logo_url in channel_logos.items():
-        normalized_logo_channel = normalize_channel_name(logo_channel)
+    def find(self, normalized_name):
+        """Restituisce la posizione della voce corrispondente, o None"""
+        if not self.keys or "\x00" in normalized_name:
+            return None
         
-        # Prova corrispondenza esatta
-        if normalized_name == normalized_logo_channel:
-            print(f"DEBUG - TROVATO! Corrispondenza esatta: '{normalized_name}' = '{normalized_logo_channel}'")
-            return logo_url
+        best = None
+        start = self.buffer.find(normalized_name)
+        if start != -1:
+            best = bisect_right(self.offsets, start) - 1
         
-        # Prova corrispondenza parziale (se il nome logo è contenuto nel nome canale o viceversa)
-        if normalized_name in normalized_logo_channel or normalized_logo_channel in normalized_name:
-            print(f"DEBUG - TROVATO! Corrispondenza parziale: '{normalized_name}' ↔ '{normalized_logo_channel}'")
-            return logo_url
+        if ahocorasick:
+            contained = [position for _, position in self.automaton.iter(normalized_name)] if self.automaton else []
+            if self.first_empty is not None:
+                contained.append(self.first_empty)
+            if contained:
+                best = min(contained) if best is None else min(best, *contained)
+        else:
+            # Basta controllare le voci che precedono quella già trovata
+            limit = len(self.keys) if best is None else best
+            for position in range(limit):
+                if self.keys[position] in normalized_name:
+                    return position
+        return best
+
+def get_logo_url(channel_name, logo_index):
+    # Normalizza il nome del canale rimuovendo solo il suffisso " .c" o " .s"
+    normalized_name = normalize_channel_name(channel_name)
     
-    # Genera URL placeholder se non esiste un logo
-    clean_name = re.sub(r"\s+\.[cs]$", "", channel_name, flags=re.IGNORECASE).strip()
-    # Sostituisci spazi con + per l'URL
-    formatted_name = clean_name.replace(" ", "+")
-    return f"https://placehold.co/400x400?text={formatted_name}&.png"
+    position = logo_index.find(normalized_name)
+    if position is not None:
+        logging.debug("TROVATO! '%s' ↔ '%s'", normalized_name, logo_index.keys[position])
+        return logo_index.urls[position]
     
     # Genera URL placeholder se non esiste un logo
-    clean_name = re.sub(r"\.[cs]$", "", channel_name, flags=re.IGNORECASE).strip()
-    # Rimuovi gli ultimi 3 caratteri come richiesto
-    if len(clean_name) > 3:
-        clean_name = clean_name[:-3]
+    clean_name = _SPACED_SUFFIX_RE.sub("", channel_name).strip()
     # Sostituisci spazi con + per l'URL
     formatted_name = clean_name.replace(" ", "+")
     return f"https://placehold.co/400x400?text={formatted_name}&.png"
 
-def get_channel_list(signature, group="Italy"):
-    headers = {
-        "Accept-Encoding": "gzip",
-        "User-Agent": "MediaHubMX/2",
-        "Accept": "application/json",
-        "Content-Type": "application/json; charset=utf-8",
-        "mediahubmx-signature": signature
+def fetch_catalog_page(signature, group, cursor):
+    data = {
+        "language": "de",
+        "region": "AT",
+        "catalogId": "vto-iptv",
+        "id": "vto-iptv",
+        "adult": False,
+        "search": "",
+        "sort": "name",
+        "filter": {"group": group},
+        "cursor": cursor,
+        "clientVersion": "3.0.2"
     }
+    body = orjson.dumps(data) if orjson else json.dumps(data)
+    response = CATALOG_CLIENT.post(CATALOG_URL, content=body, headers={"mediahubmx-signature": signature})
+    response.raise_for_status()
+    result = orjson.loads(response.content) if orjson else response.json()
+    return result.get("items", [])
 
-    cursor = 0
-    all_items = []
-
-    while True:
-        data = {
-            "language": "de",
-            "region": "AT",
-            "catalogId": "vto-iptv",
-            "id": "vto-iptv",
-            "adult": False,
-            "search": "",
-            "sort": "name",
-            "filter": {"group": group},
-            "cursor": cursor,
-            "clientVersion": "3.0.2"
-        }
-
-        try:
-            response = requests.post("https://vavoo.to/vto-cluster/mediahubmx-catalog.json", json=data, headers=headers)
-            response.raise_for_status()
-            result = response.json()
+def iter_channels(signature, group="Italy", workers=8):
+    """
+    Restituisce i canali del catalogo man mano che arrivano le pagine, così chi li consuma
+    può iniziare a scrivere la lista senza tenere in memoria l'intero catalogo.
+    """
+    try:
+        # La prima pagina ci dice quanti canali restituisce il server per richiesta
+        items = fetch_catalog_page(signature, group, 0)
+        yield from items
+        page_size = len(items)
+        cursor = page_size
 
-            items = result.get("items", [])
-            if not items:
-                break  # Se non ci sono più canali, esce dal ciclo
+        # Il server accetta qualsiasi cursore: le pagine successive si chiedono a ondate in parallelo
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            last_page = page_size == 0
+            while not last_page:
+                cursors = [cursor + k * page_size for k in range(workers)]
+                # map restituisce le pagine in ordine di cursore; una pagina incompleta è l'ultima
+                for items in executor.map(lambda c: fetch_catalog_page(signature, group, c), cursors):
+                    yield from items
+                    if len(items) < page_size:
+                        last_page = True
+                        break
+                cursor += workers * page_size
 
-            all_items.extend(items)
-            cursor += len(items)  # Aggiorna il cursore con il numero di canali ricevuti
+    except Exception as e:
+        logger.error(f"Errore durante il recupero della lista dei canali: {e}")
+    
+# Opzioni #EXTVLCOPT scritte per ogni canale (la firma resta un placeholder da sostituire)
+VLC_OPTIONS = [
+    "http-user-agent=okhttp/4.11.0",
+    "http-origin=https://vavoo.to/",
+    "http-referrer=https://vavoo.to/",
+    "mediahubmx-signature=[$KEY$]",
+]
+VLC_BLOCK = "".join(f"#EXTVLCOPT:{option}\n" for option in VLC_OPTIONS)
 
-        except Exception as e:
-            print(f"Errore durante il recupero della lista dei canali: {e}")
-            break
+M3U_HEADER = b'#EXTM3U url-tvg="http://epg-guide.com/it.gz"\n'
+# Byte accumulati in memoria prima di ogni scrittura su file
+WRITE_BUFFER_SIZE = 1 << 20
 
-    return {"items": all_items}
-    
-def generate_m3u(channels_json, signature, channel_filters, channel_remove, category_keywords, channel_logos, filename="channels.m3u8"):
+def generate_m3u(items, signature, channel_filters, channel_remove, category_keywords, channel_logos, filename="channels.m3u8"):
+    """
+    Scrive la lista M3U8 e restituisce i canali scritti, così chi la importa
+    non deve rileggere e analizzare il file appena generato.
+    items può essere un iteratore (es. iter_channels): i canali vengono scritti man mano.
+    """
     setup_logging()
-    items = channels_json.get("items", [])
-    if not items:
-        print("Nessun canale disponibile.")
-        return
+    logger.info("Generating M3U8 file...")
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        logging.debug(f"Numero di loghi disponibili: {len(channel_logos)}")
+        
+        # Mostra un campione dei loghi disponibili senza copiare l'intero dizionario
+        sample_count = min(3, len(channel_logos))
+        logging.debug(f"Campione di {sample_count} loghi:")
+        for logo_key, logo_url in itertools.islice(channel_logos.items(), sample_count):
+            logging.debug(f"'{logo_key}': '{logo_url}'")
 
-    print(f"Generating M3U8 file with {len(items)} channels...")
-    print(f"DEBUG - Numero di loghi disponibili: {len(channel_logos)}")
-    
-    # Mostra un campione dei loghi disponibili
-    sample_count = min(3, len(channel_logos))
-    print(f"DEBUG - Campione di {sample_count} loghi:")
-    sample_logos = list(channel_logos.items())[:sample_count]
-    for logo_key, logo_url in sample_logos:
-        print(f"DEBUG - '{logo_key}': '{logo_url}'")
+    matcher = KeywordMatcher(channel_filters, channel_remove, category_keywords)
+    logo_index = LogoIndex(channel_logos)
 
-    with open(filename, "w", encoding="utf-8") as f:
-        f.write('#EXTM3U url-tvg="http://epg-guide.com/it.gz"\n')
+    entries = []
+    # Ogni canale viene codificato una volta e accodato a un buffer di byte scritto a blocchi da 1 MB
+    out = bytearray(M3U_HEADER)
+    # Si scrive su un file temporaneo: la lista precedente resta valida finché quella nuova non è completa;
+    # il nome per processo e thread evita che due generazioni concorrenti scrivano sullo stesso file
+    tmp_filename = f"{filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+    idx = 0
+    with open(tmp_filename, "wb") as f:
 
         for idx, item in enumerate(items, 1):
             name = item.get("name", "Unknown")
-            if any(remove_word.lower() in name.lower() for remove_word in channel_remove):
-                print(f"Skipping channel {name} (in CHANNEL_REMOVE)")
+            removed, kept, category = matcher.match(name.lower())
+            if removed:
+                logging.debug("Skipping channel %s (in CHANNEL_REMOVE)", name)
                 continue
 
             # Se channel_filters è vuoto, includi tutti i canali
             # Altrimenti, includi solo quelli che corrispondono ai filtri
-            if channel_filters and not any(filter_word.lower() in name.lower() for filter_word in channel_filters):
-                logging.info(f"Excluded channel: {name}")
+            if not kept:
+                excluded_logger.info(f"Excluded channel: {name}")
                 continue
 
             tvg_id = sanitize_tvg_id(name)
@@ -164,64 +418,93 @@ def generate_m3u(channels_json, signature, channel_filters, channel_remove, cate
             if not original_link:
                 continue
 
-            print(f"Processing channel {idx}/{len(items)}: {name}")
+            # Avanzamento ogni 100 canali: un print per canale costa più della generazione stessa
+            if idx % 100 == 0:
+                logger.debug(f"Processing channel {idx}")
             
             # Non risolvere il link, usarlo direttamente
-            category = get_category(name, category_keywords)
-            logo_url = get_logo_url(name, channel_logos)
+            logo_url = get_logo_url(name, logo_index)
 
-            f.write(f'#EXTINF:-1 tvg-id="{tvg_id}" tvg-name="{tvg_id}" tvg-logo="{logo_url}" group-title="{category}",{tvg_id}\n')
-            # Aggiungi header per il player
-            f.write('#EXTVLCOPT:http-user-agent=okhttp/4.11.0\n')
-            f.write('#EXTVLCOPT:http-origin=https://vavoo.to/\n')
-            f.write('#EXTVLCOPT:http-referrer=https://vavoo.to/\n')
-            f.write('#EXTVLCOPT:mediahubmx-signature=[$KEY$]\n')  # Placeholder per la chiave di firma
-            f.write(f'{original_link}\n')
+            # Riga EXTINF, header per il player e link
+            out += f'#EXTINF:-1 tvg-id="{tvg_id}" tvg-name="{tvg_id}" tvg-logo="{logo_url}" group-title="{category}",{tvg_id}\n{VLC_BLOCK}{original_link}\n'.encode("utf-8")
+            entries.append({"tvg_id": tvg_id, "logo": logo_url, "category": category, "url": original_link})
+            if len(out) >= WRITE_BUFFER_SIZE:
+                f.write(out)
+                out.clear()
 
-    print(f"M3U8 file generated successfully: {filename}")
+        f.write(out)
 
+    if not idx:
+        os.remove(tmp_filename)
+        logger.info("Nessun canale disponibile.")
+        return []
+    os.replace(tmp_filename, filename)
+    logger.info(f"M3U8 file generated successfully: {filename} ({len(entries)} channels)")
+    return entries
 
-def main():
+
+@functools.lru_cache(maxsize=1)
+def load_defaults():
+    # Valori predefiniti letti da defaults.json solo quando manca un file di configurazione
+    return load_config(DEFAULTS_FILE)
+
+def load_config_or_default(filename):
+    data = load_config(filename)
+    if not data:
+        name = os.path.splitext(filename)[0]
+        data = copy.deepcopy(load_defaults().get(name, {}))
+        # Crea il file con i valori predefiniti, così l'utente può modificarlo
+        save_config(filename, data)
+    return data
+
+def load_configs():
     # Carica configurazioni da file separati
-    channel_filters = load_config("channel_filters.json")
-    if not channel_filters:
-        channel_filters = []  # Nessun filtro predefinito
-        # Crea un file vuoto
-        with open("channel_filters.json", 'w', encoding='utf-8') as f:
-            json.dump(channel_filters, f, indent=4)
+    channel_filters = load_config_or_default("channel_filters.json")
+    channel_remove = load_config_or_default("channel_remove.json")
+    category_keywords = load_config_or_default("category_keywords.json")
+    channel_logos = load_config_or_default("channel_icons.json")
     
-    channel_remove = load_config("channel_remove.json")
-    if not channel_remove:
-        channel_remove = []  # Nessun filtro di rimozione predefinito
-        with open("channel_remove.json", 'w', encoding='utf-8') as f:
-            json.dump(channel_remove, f, indent=4)
+    # Le parole chiave si confrontano sempre in minuscolo: le convertiamo una volta sola qui
+    channel_filters = [word.lower() for word in channel_filters]
+    channel_remove = [word.lower() for word in channel_remove]
+    category_keywords = {category: [keyword.lower() for keyword in keywords] for category, keywords in category_keywords.items()}
     
-    category_keywords = load_config("category_keywords.json")
-    if not category_keywords:
-        category_keywords = {"ALTRI": []}  # Solo la categoria default
-        with open("category_keywords.json", 'w', encoding='utf-8') as f:
-            json.dump(category_keywords, f, indent=4)
-    
-    channel_logos = load_config("channel_icons.json")
-    if not channel_logos:
-        channel_logos = {}  # Non usiamo più il CHANNEL_LOGOS predefinito
-        with open("channel_icons.json", 'w', encoding='utf-8') as f:
-            json.dump(channel_logos, f, indent=4)
-    
-    print("Getting authentication signature...")
-    signature = get_auth_signature()
-    if not signature:
-        print("Failed to get authentication signature.")
-        sys.exit(1)
-
-    print("Getting channel list...")
-    channels_json = get_channel_list(signature)
-    if not channels_json:
-        print("Failed to get channel list.")
-        sys.exit(1)
-
-    print("Generating M3U8 file...")
-    generate_m3u(channels_json, signature, channel_filters, channel_remove, category_keywords, channel_logos)
+    return channel_filters, channel_remove, category_keywords, channel_logos
+
+def main():
+    parser = argparse.ArgumentParser(description='Genera la lista M3U8 dei canali Vavoo')
+    parser.add_argument('--force-refresh', action='store_true', help='Ignora la firma salvata su disco')
+    parser.add_argument('--get-signature', action='store_true', help='Stampa solo la firma di autenticazione')
+    args = parser.parse_args()
+
+    if args.get_signature:
+        with SESSION:
+            signature = get_cached_signature(args.force_refresh)
+        if not signature:
+            sys.exit(1)
+        print(signature)
+        return
+
+    # Output a blocchi: le stampe di avanzamento non forzano un flush per riga
+    sys.stdout.reconfigure(line_buffering=False)
+    # Da script i messaggi del modulo (avanzamento compreso) vanno su stdout come semplici print
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(console_handler)
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    channel_filters, channel_remove, category_keywords, channel_logos = load_configs()
+
+    with SESSION, CATALOG_CLIENT:
+        print("Getting authentication signature...")
+        signature = get_cached_signature(args.force_refresh)
+        if not signature:
+            print("Failed to get authentication signature.")
+            sys.exit(1)
+
+        print("Getting channel list...")
+        # I canali vengono scritti mentre le pagine del catalogo arrivano
+        generate_m3u(iter_channels(signature), signature, channel_filters, channel_remove, category_keywords, channel_logos)
     print("Done!")
 
 # Nessun dato di fallback, leggiamo tutto dai file
@@ -1,8 +1,177 @@
 #!/usr/bin/env python3
-import requests
+import httpx
+import asyncio
+import hashlib
+import os
+import random
 import sys
 import json
+import logging
 import argparse
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger("resolver")
+
+RESOLVE_URL = "https://vavoo.to/vto-cluster/mediahubmx-resolve.json"
+
+# Header e corpo uguali per ogni richiesta: cambiano solo signature e url
+RESOLVE_HEADERS = MappingProxyType({
+    "user-agent": "MediaHubMX/2",
+    "accept": "application/json",
+    "content-type": "application/json; charset=utf-8",
+    # Le risposte sono poche centinaia di byte: la compressione costa più di quanto risparmia.
+    # "identity" esplicito, altrimenti httpx chiederebbe comunque gzip/deflate
+    "accept-encoding": "identity",
+})
+RESOLVE_DATA = MappingProxyType({
+    "language": "de",
+    "region": "AT",
+    "clientVersion": "3.0.2",
+})
+
+# Client HTTP/2 condiviso: le risoluzioni ravvicinate viaggiano su un'unica connessione TLS verso vavoo.to
+_CLIENT = httpx.Client(
+    transport=httpx.HTTPTransport(
+        http2=True,
+        retries=2,
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+    ),
+    headers=dict(RESOLVE_HEADERS),
+    timeout=httpx.Timeout(8.0, connect=3.05),
+)
+
+def build_resolve_request(link, signature):
+    """
+    Prepara header e corpo della richiesta di risoluzione verso Vavoo.
+    
+    Args:
+        link (str): L'URL da risolvere
+        signature (str): La signature di autenticazione Vavoo
+        
+    Returns:
+        tuple: (headers, data) da inviare all'endpoint di risoluzione
+    """
+    headers = {**RESOLVE_HEADERS, "mediahubmx-signature": signature}
+
+    data = {**RESOLVE_DATA, "url": link}
+    return headers, data
+
+class TTLCache:
+    """
+    Piccola cache LRU con scadenza per voce, condivisa tra thread.
+    I valori None (risoluzione fallita) scadono prima, per non ripetere subito richieste destinate a fallire.
+    """
+    MISSING = object()
+
+    def __init__(self, maxsize=1024, ttl=300, negative_ttl=10):
+        self.maxsize, self.ttl, self.negative_ttl = maxsize, ttl, negative_ttl
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            item = self.data.get(key)
+            if item is None or item[0] < time.monotonic():
+                if item is not None:
+                    del self.data[key]
+                self.misses += 1
+                return self.MISSING
+            self.data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def set(self, key, value):
+        ttl = self.ttl if value is not None else self.negative_ttl
+        with self.lock:
+            self.data[key] = (time.monotonic() + ttl, value)
+            self.data.move_to_end(key)
+            if len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+            self.hits = self.misses = 0
+
+    def info(self):
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self.data), "maxsize": self.maxsize}
+
+# Risoluzioni recenti per (link, signature)
+_RESOLVE_CACHE = TTLCache(maxsize=1024, ttl=300, negative_ttl=10)
+
+# Cache su disco condivisa tra esecuzioni della CLI: un file per (link, signature), scritto in modo atomico
+DISK_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "vavoo_resolver")
+DISK_CACHE_TTL = 300
+# Ogni scrittura ha una probabilità fissa di ripulire la directory da voci scadute e .tmp orfani
+DISK_CACHE_SWEEP_PROBABILITY = 1 / 64
+
+def _disk_cache_path(link, signature):
+    digest = hashlib.sha1(f"{link}\n{signature}".encode("utf-8")).hexdigest()
+    return os.path.join(DISK_CACHE_DIR, f"{digest}.json")
+
+def disk_cache_get(link, signature):
+    path = _disk_cache_path(link, signature)
+    try:
+        with open(path, "rb") as f:
+            entry = loads(f.read())
+        if entry["expires"] > time.time():
+            return entry["url"]
+        os.remove(path)
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+def _disk_cache_sweep():
+    # Le voci scadono DISK_CACHE_TTL secondi dopo la scrittura: basta l'mtime, senza leggere i file
+    cutoff = time.time() - DISK_CACHE_TTL
+    try:
+        with os.scandir(DISK_CACHE_DIR) as entries:
+            for entry in entries:
+                if not entry.name.endswith((".json", ".tmp")):
+                    continue
+                try:
+                    if entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                except OSError:
+                    pass
+    except OSError:
+        pass
+
+def disk_cache_set(link, signature, resolved_url):
+    path = _disk_cache_path(link, signature)
+    # File temporaneo per processo e thread: scritture concorrenti non si sovrascrivono a metà
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(DISK_CACHE_DIR, exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            f.write(dumps({"url": resolved_url, "expires": time.time() + DISK_CACHE_TTL}))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning("Impossibile salvare la cache di risoluzione: %s", e)
+    if random.random() < DISK_CACHE_SWEEP_PROBABILITY:
+        _disk_cache_sweep()
+
+def dumps(data):
+    return orjson.dumps(data) if orjson else json.dumps(data).encode()
+
+def loads(content):
+    return orjson.loads(content) if orjson else json.loads(content)
+
+def parse_resolve_response(result):
+    if isinstance(result, list) and result and isinstance(result[0], dict) and "url" in result[0]:
+        return result[0]["url"]
+    return None
 
 def resolve_link(link, signature):
     """
@@ -12,57 +181,143 @@ def resolve_link(link, signature):
         link (str): L'URL da risolvere
         signature (str): La signature di autenticazione Vavoo
         
+    Returns:
+        str: L'URL risolto o None in caso di errore (i risultati restano in cache per qualche minuto)
+    """
+    if "localhost" in link:
+        return link
+
+    key = (link, signature)
+    resolved_url = _RESOLVE_CACHE.get(key)
+    if resolved_url is TTLCache.MISSING:
+        resolved_url = disk_cache_get(link, signature)
+        if resolved_url is None:
+            resolved_url = _fetch_link(link, signature)
+            if resolved_url is not None:
+                disk_cache_set(link, signature, resolved_url)
+        _RESOLVE_CACHE.set(key, resolved_url)
+    return resolved_url
+
+resolve_link.cache_clear = _RESOLVE_CACHE.clear
+resolve_link.cache_info = _RESOLVE_CACHE.info
+
+def _fetch_link(link, signature):
+    _, data = build_resolve_request(link, signature)
+
+    try:
+        # Gli header statici sono già sul client: si aggiunge solo la signature
+        response = _CLIENT.post(RESOLVE_URL, content=dumps(data), headers={"mediahubmx-signature": signature})
+        if response.status_code != 200:
+            logger.warning("Errore durante la risoluzione del link: HTTP %s", response.status_code)
+            return None
+        return parse_resolve_response(loads(response.content))
+    except (httpx.HTTPError, ValueError) as e:
+        logger.error("Errore durante la risoluzione del link: %s", e)
+    return None
+
+async def resolve_link_async(client, link, signature):
+    """
+    Versione asincrona di resolve_link per l'uso in-process.
+    
+    Args:
+        client (httpx.AsyncClient): Client condiviso, mantiene le connessioni aperte tra le richieste
+        link (str): L'URL da risolvere
+        signature (str): La signature di autenticazione Vavoo
+        
     Returns:
         str: L'URL risolto o None in caso di errore
     """
     if "localhost" in link:
         return link
 
-    headers = {
-        "user-agent": "MediaHubMX/2",
-        "accept": "application/json",
-        "content-type": "application/json; charset=utf-8",
-        "accept-encoding": "gzip",
-        "mediahubmx-signature": signature
-    }
-
-    data = {
-        "language": "de",
-        "region": "AT",
-        "url": link,
-        "clientVersion": "3.0.2"
-    }
+    key = (link, signature)
+    resolved_url = _RESOLVE_CACHE.get(key)
+    if resolved_url is TTLCache.MISSING:
+        resolved_url = await _fetch_link_async(client, link, signature)
+        _RESOLVE_CACHE.set(key, resolved_url)
+    return resolved_url
+
+async def _fetch_link_async(client, link, signature):
+    headers, data = build_resolve_request(link, signature)
 
     try:
-        response = requests.post("https://vavoo.to/vto-cluster/mediahubmx-resolve.json", json=data, headers=headers)
-        response.raise_for_status()
-        result = response.json()
-        if isinstance(result, list) and result and "url" in result[0]:
-            return result[0]["url"]
-    except Exception as e:
-        print(f"Errore durante la risoluzione del link: {e}", file=sys.stderr)
+        response = await client.post(RESOLVE_URL, content=dumps(data), headers=headers, timeout=httpx.Timeout(8.0, connect=3.05))
+        if response.status_code != 200:
+            logger.warning("Errore durante la risoluzione del link: HTTP %s", response.status_code)
+            return None
+        return parse_resolve_response(loads(response.content))
+    except (httpx.HTTPError, ValueError) as e:
+        logger.error("Errore durante la risoluzione del link: %s", e)
     return None
 
+async def resolve_links_async(client, links, signature, concurrency=20):
+    """
+    Risolve più link in parallelo sullo stesso client, con al massimo `concurrency` richieste in volo.
+    
+    Args:
+        client (httpx.AsyncClient): Client condiviso tra tutte le richieste
+        links (list): Gli URL da risolvere
+        signature (str): La signature di autenticazione Vavoo
+        concurrency (int): Numero massimo di richieste contemporanee
+        
+    Returns:
+        list: Gli URL risolti (o None) nello stesso ordine di `links`
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def resolve_one(link):
+        async with semaphore:
+            return await resolve_link_async(client, link, signature)
+
+    return await asyncio.gather(*(resolve_one(link) for link in links))
+
+def resolve_links(links, signature, concurrency=20):
+    """
+    Versione sincrona di resolve_links_async: apre un client HTTP/2 e risolve tutti i link in un colpo solo.
+    
+    Args:
+        links (list): Gli URL da risolvere
+        signature (str): La signature di autenticazione Vavoo
+        concurrency (int): Numero massimo di richieste contemporanee
+        
+    Returns:
+        list: Gli URL risolti (o None) nello stesso ordine di `links`
+    """
+    async def run():
+        limits = httpx.Limits(max_connections=50, max_keepalive_connections=50, keepalive_expiry=75)
+        async with httpx.AsyncClient(http2=True, limits=limits, timeout=httpx.Timeout(10.0, connect=3.05)) as client:
+            return await resolve_links_async(client, links, signature, concurrency)
+
+    return asyncio.run(run())
+
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description='Risolvi un link Vavoo')
-    parser.add_argument('--url', required=True, help='URL da risolvere')
+    parser = argparse.ArgumentParser(description='Risolvi uno o più link Vavoo')
+    parser.add_argument('--url', required=True, nargs='+', help='URL da risolvere (anche più di uno)')
     parser.add_argument('--signature', required=True, help='Signature per autenticazione')
-    parser.add_argument('--json', action='store_true', help='Restituisci output in formato JSON')
+    parser.add_argument('--json', action='store_true', help='Restituisci output in formato JSON (una riga per URL)')
     
     args = parser.parse_args()
     
-    resolved_url = resolve_link(args.url, args.signature)
+    # Le richieste sono I/O: i thread condividono il client e le sue connessioni
+    with ThreadPoolExecutor(max_workers=min(32, len(args.url))) as executor:
+        resolved_urls = list(executor.map(lambda url: resolve_link(url, args.signature), args.url))
     
-    if args.json:
-        result = {
-            "original_url": args.url,
-            "resolved_url": resolved_url,
-            "success": resolved_url is not None
-        }
-        print(json.dumps(result))
-    else:
-        if resolved_url:
+    failed = False
+    for url, resolved_url in zip(args.url, resolved_urls):
+        if args.json:
+            result = {
+                "original_url": url,
+                "resolved_url": resolved_url,
+                "success": resolved_url is not None
+            }
+            # Byte già codificati direttamente sullo stdout binario, senza passare da str e print
+            sys.stdout.buffer.write(dumps(result) + b"\n")
+        elif resolved_url:
             print(resolved_url)
         else:
-            print("Errore: Impossibile risolvere l'URL", file=sys.stderr)
-            sys.exit(1)
+            print(f"Errore: Impossibile risolvere l'URL {url}" if len(args.url) > 1 else "Errore: Impossibile risolvere l'URL", file=sys.stderr)
+            failed = True
+    sys.stdout.flush()
+    
+    if failed:
+        sys.exit(1)